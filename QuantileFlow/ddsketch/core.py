@@ -3,7 +3,8 @@
 Optimized for high throughput with efficient bucket indexing and quantile queries.
 """
 
-from typing import Literal, Union
+from typing import List, Literal, Union
+import numpy as np
 from .mapping.logarithmic import LogarithmicMapping
 from .mapping.linear_interpolation import LinearInterpolationMapping
 from .mapping.cubic_interpolation import CubicInterpolationMapping
@@ -26,7 +27,8 @@ class DDSketch:
     """
     
     __slots__ = ('relative_accuracy', 'cont_neg', 'mapping', 'positive_store',
-                 'negative_store', 'count', 'zero_count', '_min', '_max', '_sum')
+                 'negative_store', 'count', 'zero_count', '_min', '_max', '_sum',
+                 '_bucket_index', '_positive_add', '_negative_add')
     
     def __init__(
         self,
@@ -77,6 +79,12 @@ class DDSketch:
             self.positive_store = SparseStorage(strategy=bucket_strategy)
             self.negative_store = SparseStorage(strategy=bucket_strategy) if cont_neg else None
             
+        # Bind the per-insert calls once; mapping and stores are fixed for the
+        # sketch's lifetime, so insert() skips two attribute lookups per value
+        self._bucket_index = self.mapping.compute_bucket_index
+        self._positive_add = self.positive_store.add
+        self._negative_add = self.negative_store.add if cont_neg else None
+            
         self.count = 0.0
         self.zero_count = 0.0
         
@@ -96,16 +104,12 @@ class DDSketch:
         Raises:
             ValueError: If value is negative and cont_neg is False.
         """
-        # Cache method lookups for hot path optimization
         if value > 0:
-            # Most common case: positive values
-            # Inline the hot path with cached local references
-            compute_idx = self.mapping.compute_bucket_index
-            self.positive_store.add(compute_idx(value), weight)
+            # Most common case: positive values, through the pre-bound calls
+            self._positive_add(self._bucket_index(value), weight)
         elif value < 0:
             if self.cont_neg:
-                compute_idx = self.mapping.compute_bucket_index
-                self.negative_store.add(compute_idx(-value), weight)
+                self._negative_add(self._bucket_index(-value), weight)
             else:
                 raise ValueError("Negative values not supported when cont_neg is False")
         else:
@@ -125,6 +129,73 @@ class DDSketch:
         """Alias for insert()."""
         self.insert(value, weight)
     
+    def insert_batch(self, values: Union[List[float], np.ndarray], weight: float = 1.0) -> None:
+        """
+        Insert multiple values into the sketch.
+
+        Bucket indices are computed for the whole array at once and counts are
+        aggregated per bucket, so each store is updated in a single
+        add_many pass per batch.
+
+        float32 arrays are accepted without an up-front copy, halving the
+        memory traffic of the batch; the mappings still compute bucket
+        indices in float64, so keys match the scalar insert path. Other
+        inputs are converted to float64.
+
+        Args:
+            values: Array or list of values to insert.
+            weight: The weight applied to every value (default 1.0).
+
+        Raises:
+            ValueError: If values contain NaN or infinity, or contain
+                negatives and cont_neg is False.
+        """
+        values = np.asarray(values)
+        if values.dtype != np.float32:
+            values = values.astype(np.float64, copy=False)
+        values = values.ravel()
+        n = values.size
+        if n == 0:
+            return
+        if not np.isfinite(values).all():
+            raise ValueError("Cannot insert NaN or infinite values")
+
+        neg_mask = values < 0
+        has_neg = bool(neg_mask.any())
+        if has_neg and not self.cont_neg:
+            raise ValueError("Negative values not supported when cont_neg is False")
+
+        compute_indices = self.mapping.compute_bucket_indices
+        if has_neg:
+            # Map all magnitudes in one pass, then split the keys by sign
+            magnitudes = np.abs(values)
+            nonzero = magnitudes > 0
+            keys = compute_indices(magnitudes[nonzero])
+            neg_keys_mask = neg_mask[nonzero]
+            pos_keys = keys[~neg_keys_mask]
+            neg_keys = keys[neg_keys_mask]
+        else:
+            nonzero = values > 0
+            pos_keys = compute_indices(values[nonzero])
+            neg_keys = pos_keys[:0]
+
+        if pos_keys.size:
+            keys, counts = np.unique(pos_keys, return_counts=True)
+            self.positive_store.add_many(keys.tolist(), (counts * weight).tolist())
+        if neg_keys.size:
+            keys, counts = np.unique(neg_keys, return_counts=True)
+            self.negative_store.add_many(keys.tolist(), (counts * weight).tolist())
+
+        self.zero_count += (n - pos_keys.size - neg_keys.size) * weight
+        self.count += n * weight
+        self._sum += float(values.sum(dtype=np.float64)) * weight
+        batch_min = float(values.min())
+        batch_max = float(values.max())
+        if batch_min < self._min:
+            self._min = batch_min
+        if batch_max > self._max:
+            self._max = batch_max
+    
     def delete(self, value: Union[int, float]) -> None:
         """
         Delete a value from the sketch.
@@ -192,6 +263,32 @@ class DDSketch:
         key = self.positive_store.key_at_rank(rank)
         return self.mapping.compute_value_from_index(key)
     
+    def quantiles(self, fractions: List[float]) -> List[float]:
+        """
+        Compute several approximate quantiles at once.
+        
+        The stores cache their cumulative counts, so the buckets are summed
+        once for the whole request and each quantile is a binary search.
+        
+        Args:
+            fractions: List of quantiles between 0 and 1.
+            
+        Returns:
+            List of approximate values, in the order of fractions.
+            
+        Raises:
+            ValueError: If any fraction is not between 0 and 1 or if the
+                sketch is empty.
+        """
+        for q in fractions:
+            if not 0 <= q <= 1:
+                raise ValueError("All quantiles must be between 0 and 1")
+        if self.count == 0:
+            raise ValueError("Cannot compute quantile of empty sketch")
+        
+        quantile = self.quantile
+        return [quantile(q) for q in fractions]
+    
     # Alias for API compatibility
     def get_quantile_value(self, quantile: float) -> float:
         """Alias for quantile()."""
@@ -1,6 +1,7 @@
 """Base class for DDSketch mapping schemes."""
 
 from abc import ABC, abstractmethod
+import numpy as np
 
 
 class MappingScheme(ABC):
@@ -14,4 +15,14 @@ class MappingScheme(ABC):
     @abstractmethod
     def compute_value_from_index(self, index: int) -> float:
         """Compute the representative value for a given bucket index."""
-        pass
\ No newline at end of file
+        pass
+
+    def compute_bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the bucket indices for an array of positive values.
+        
+        Falls back to calling compute_bucket_index per value; subclasses
+        override this with a vectorized implementation where possible.
+        """
+        compute_idx = self.compute_bucket_index
+        return np.fromiter((compute_idx(v) for v in values), dtype=np.int64, count=len(values))
\ No newline at end of file
@@ -66,6 +66,15 @@ class CubicInterpolationMapping(MappingScheme):
         index = self.m * (exponent + interpolated) / self.log2_gamma
         return math.ceil(index)
         
+    def compute_bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized compute_bucket_index for an array of positive values."""
+        # Interpolate in float64 whatever the input dtype, matching the scalar path
+        mantissa, exponent = np.frexp(np.asarray(values, dtype=np.float64))
+        significand = mantissa * 2 - 1
+        interpolated = self._cubic_interpolation(significand)
+        index = self.m * ((exponent - 1) + interpolated) / self.log2_gamma
+        return np.ceil(index).astype(np.int64)
+        
     def compute_value_from_index(self, index: float) -> float:
         """
         Compute the value from a bucket index using Cardano's formula
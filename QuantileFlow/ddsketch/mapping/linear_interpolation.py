@@ -7,6 +7,7 @@ This implementation approximates the memory-optimal logarithmic mapping by:
 """
 
 import math
+import numpy as np
 from .base import MappingScheme
 
 class LinearInterpolationMapping(MappingScheme):
@@ -41,6 +42,13 @@ class LinearInterpolationMapping(MappingScheme):
         log2_value = exponent + log2_fraction
         return math.ceil(log2_value / self.log_gamma)
         
+    def compute_bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized compute_bucket_index for an array of positive values."""
+        # Interpolate in float64 whatever the input dtype, matching the scalar path
+        mantissa, exponent = np.frexp(np.asarray(values, dtype=np.float64))
+        log2_value = (exponent - 1) + (mantissa * 2 - 1)
+        return np.ceil(log2_value / self.log_gamma).astype(np.int64)
+        
     def compute_value_from_index(self, index: int) -> float:
         """
         Compute the value corresponding to a bucket index using the inverse mapping.
@@ -1,6 +1,7 @@
 """Logarithmic mapping scheme for DDSketch."""
 
 import math
+import numpy as np
 from .base import MappingScheme
 
 
@@ -33,6 +34,15 @@ class LogarithmicMapping(MappingScheme):
         """
         return math.ceil(math.log(value) * self.multiplier)
     
+    def compute_bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized compute_bucket_index for an array of positive values."""
+        # Reuse one temporary for log, scale and ceil to save two allocations;
+        # the log is taken in float64 so float32 input keys like the scalar path
+        scaled = np.log(values, dtype=np.float64)
+        scaled *= self.multiplier
+        np.ceil(scaled, out=scaled)
+        return scaled.astype(np.int64)
+    
     def compute_value_from_index(self, index: int) -> float:
         """Compute the representative value for a given bucket index.
         
@@ -50,6 +50,20 @@ class Storage(ABC):
         """Add count to bucket_index."""
         pass
     
+    def add_many(self, bucket_indices, counts):
+        """
+        Add counts to many bucket indices at once.
+        
+        Subclasses may override this to update their buckets in a single pass.
+        
+        Args:
+            bucket_indices: Sequence of bucket indices.
+            counts: Sequence of counts, one per bucket index.
+        """
+        add = self.add
+        for bucket_index, count in zip(bucket_indices, counts):
+            add(bucket_index, count)
+    
     @abstractmethod
     def remove(self, bucket_index: int, count: int = 1) -> bool:
         """
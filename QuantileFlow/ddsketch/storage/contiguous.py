@@ -92,9 +92,9 @@ class ContiguousStorage(Storage):
     @property
     def num_buckets(self):
         """Lazily compute the number of non-zero buckets."""
-        if not self.bins:
-            return 0
-        return sum(1 for b in self.bins if b > 0)
+        bins = self.bins
+        # Counts never go negative, so counting zeros in C is enough
+        return len(bins) - bins.count(0.0)
     
     @property
     def counts(self):
@@ -119,11 +119,43 @@ class ContiguousStorage(Storage):
             key: The bucket index to add to.
             weight: The weight to add (default 1.0).
         """
-        idx = self._get_index(key)
+        # Inline the in-range fast path of _get_index to save a call per add
+        min_key = self.min_key
+        if min_key is not None and min_key <= key <= self.max_key:
+            idx = key - self.offset
+        else:
+            idx = self._get_index(key)
         self.bins[idx] += weight
         self.count += weight
         self._cumulative_valid = False
     
+    def add_many(self, keys, weights):
+        """
+        Add weights to many bins at once.
+        
+        The range is extended at most twice, for the smallest and largest key,
+        after which every key is written straight into the bins.
+        
+        Args:
+            keys: Bucket indices, in any order.
+            weights: The weight to add for each key.
+        """
+        if len(keys) == 0:
+            return
+        self._get_index(min(keys))
+        self._get_index(max(keys))
+        
+        bins = self.bins
+        offset = self.offset
+        min_key = self.min_key
+        total = 0.0
+        for key, weight in zip(keys, weights):
+            # Keys below min_key only remain after a collapse; they land in bin 0
+            bins[key - offset if key >= min_key else 0] += weight
+            total += weight
+        self.count += total
+        self._cumulative_valid = False
+    
     def _get_index(self, key):
         """Calculate the bin index for the key, extending the range if necessary.
         
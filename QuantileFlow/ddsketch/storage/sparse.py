@@ -46,6 +46,11 @@ class SparseStorage(Storage):
         """Alias for max_index for API compatibility."""
         return self.max_index
     
+    @property
+    def num_buckets(self):
+        """Number of non-empty buckets; empty buckets are never kept."""
+        return len(self.counts)
+    
     def add(self, bucket_index: int, count: int = 1):
         """
         Add count to bucket_index.
@@ -74,6 +79,47 @@ class SparseStorage(Storage):
             len(self.counts) > self.max_buckets):
             self.collapse_smallest_buckets()
     
+    def add_many(self, bucket_indices, counts):
+        """
+        Add counts to many bucket indices at once.
+        
+        Min/max tracking, the dynamic limit and bucket collapsing are applied
+        once for the whole batch instead of after every bucket.
+        
+        Args:
+            bucket_indices: Bucket indices, in any order.
+            counts: The count to add for each bucket index.
+        """
+        store = self.counts
+        get = store.get
+        added = 0
+        lo = hi = None
+        for bucket_index, count in zip(bucket_indices, counts):
+            if count <= 0:
+                continue
+            store[bucket_index] = get(bucket_index, 0) + count
+            added += count
+            if lo is None or bucket_index < lo:
+                lo = bucket_index
+            if hi is None or bucket_index > hi:
+                hi = bucket_index
+        if not added:
+            return
+        self.total_count += added
+        self._cache_valid = False
+        
+        if self.min_index is None or lo < self.min_index:
+            self.min_index = lo
+        if self.max_index is None or hi > self.max_index:
+            self.max_index = hi
+        
+        if self.strategy == BucketManagementStrategy.DYNAMIC:
+            self._update_dynamic_limit()
+            
+        if self.strategy != BucketManagementStrategy.UNLIMITED:
+            while len(store) > self.max_buckets:
+                self.collapse_smallest_buckets()
+    
     def remove(self, bucket_index: int, count: int = 1) -> bool:
         """
         Remove count from bucket_index.
@@ -1,8 +1,11 @@
 from kafka import KafkaConsumer
-import json
+import msgspec
+import numpy as np
+import queue
 import signal
 import logging
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -18,31 +21,69 @@ from QuantileFlow.hdrhistogram import HDRHistogram as QuantileFlowHDRHistogram
 from ddsketch import DDSketch as DatadogDDSketch
 from QuantileFlow.momentsketch import MomentSketch as QuantileFlowMomentSketch
 
-# Optional line profiler import
-try:
-    from line_profiler import LineProfiler
-    LINE_PROFILER_AVAILABLE = True
-except ImportError:
-    LINE_PROFILER_AVAILABLE = False
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on polled batches waiting to be inserted; the fetcher blocks
+# once it is reached so memory stays bounded when the sketch falls behind.
+# Auto-commit covers everything poll() returned, so while the service runs
+# committed offsets can be up to this many batches ahead of the sketch; a
+# graceful shutdown drains them before the consumer closes
+MAX_PENDING_BATCHES = 32
+
+# Short poll timeout so the fetcher notices shutdown promptly; the consumer's
+# fetch_max_wait_ms already bounds how long the broker holds a fetch
+POLL_TIMEOUT_MS = 100
+
+class LatencyMsg(msgspec.Struct):
+    """Schema of the messages published by LogProducer."""
+    latency: float
+    block_id: str
+
+_decoder = msgspec.json.Decoder(LatencyMsg)
+
 def deserialize_message(msg):
-    return json.loads(msg.decode('utf-8'))
+    return _decoder.decode(msg)
+
+def _datadog_insert_batch(sketch):
+    """Build a batch-insert helper for Datadog's DDSketch, which has no bulk API."""
+    add = sketch.add
+    def insert_batch(values):
+        for v in values:
+            add(v)
+    return insert_batch
+
+def _moment_summary(sketch):
+    """Return (count, mean) for a MomentSketch."""
+    summary = sketch.summary_statistics()
+    return int(summary.get('count', 0)), summary.get('mean', 0)
+
+class Stats:
+    """Dashboard statistics, allocated once and updated in place on each refresh."""
+    __slots__ = ('count', 'mean', 'p50', 'p95', 'p99')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0
+        self.p50 = 0
+        self.p95 = 0
+        self.p99 = 0
 
 class LatencyMonitor:
-    def __init__(self, sketch_type='quantileflow', window_size=100, refresh_interval=0.0001, dd_accuracy=0.01, moment_count=10, enable_line_profile=False, profile_output='line_profile_kafka.txt'):
+    def __init__(self, sketch_type='quantileflow', window_size=100, refresh_interval=0.0001, dd_accuracy=0.01, moment_count=10, enable_line_profile=False, profile_output='line_profile_kafka.txt', profile_sample_rate=1):
         self.window_size = window_size
         self.running = True
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.last_refresh = 0
         self.refresh_interval = refresh_interval
         self.msg_count = 0
+        self.dropped_count = 0
         self.sketch_type = sketch_type
         self.enable_line_profile = enable_line_profile
         self.profile_output = profile_output
+        self.profile_sample_rate = max(1, profile_sample_rate)
         self.line_profiler = None
+        self._stats = Stats()
         
         # Initialize the selected sketch for quantile computation
         if sketch_type == 'quantileflow':
@@ -61,16 +102,71 @@ class LatencyMonitor:
         else:
             raise ValueError(f"Unknown sketch type: {sketch_type}")
         
+        # Bind sketch-specific entry points once so the hot path never
+        # re-dispatches on sketch_type
+        if sketch_type == 'datadog':
+            self._insert_batch = _datadog_insert_batch(self.sketch)
+            self._quantile_fn = self.sketch.get_quantile_value
+        else:
+            self._insert_batch = self.sketch.insert_batch
+            self._quantile_fn = self.sketch.quantile
+        
+        if sketch_type == 'momentsketch':
+            # MomentSketch uses summary_statistics() for count and mean
+            self._summary_fn = lambda s=self.sketch: _moment_summary(s)
+        elif sketch_type == 'hdrhistogram':
+            # HDRHistogram uses total_count
+            self._summary_fn = lambda s=self.sketch: (s.total_count, 0)
+        else:
+            # Both DDSketch implementations use .count
+            self._summary_fn = lambda s=self.sketch: (s.count, 0)
+        
+        # Dashboard frame template; the constant parts are filled in here so each
+        # render is a single format() call and a single write
+        rule = '=' * 80
+        frame = (
+            f"{rule}\n"
+            "Latency Monitor Dashboard - {timestamp}\n"
+            f"Sketch Algorithm: {self.sketch_name}\n"
+            f"{rule}\n\n"
+            # Block Information
+            "Block ID: {block_id}\n"
+            "Current Latency: {latency:>8.2f} ms\n\n"
+            # Performance Metrics
+            "Performance Metrics:\n"
+            "Messages Processed: {msg_count:>8.0f}\n"
+            "Data Points in Sketch: {count:>8.0f}\n"
+            "Dropped Records: {dropped:>8.0f}\n"
+            "Runtime: {elapsed:>8.2f} sec\n"
+            "Throughput: {throughput:>8.2f} msg/sec\n"
+            f"Refresh Rate: {self.refresh_interval:>8.2f} sec\n\n"
+            # Statistics
+            "Latency Statistics:\n"
+            "  Mean: {mean:>8.2f} ms\n\n"
+            f"{self.sketch_name} Percentiles:\n"
+            "  P50:  {p50:>8.2f} ms\n"
+            "  P95:  {p95:>8.2f} ms\n"
+            "  P99:  {p99:>8.2f} ms\n"
+            f"\n{rule}\n"
+        )
+        # Repaint in place: cursor home, erase the rest of each line, then
+        # erase below the frame, instead of clearing the whole screen
+        self._frame_tmpl = "\033[H" + frame.replace("\n", "\033[K\n") + "\033[J"
+        
         # Setup line profiler if enabled
         if self.enable_line_profile:
-            if not LINE_PROFILER_AVAILABLE:
-                logger.error("line_profiler is not installed! Install with: pip install line_profiler")
-                self.enable_line_profile = False
-            else:
-                self._setup_line_profiler()
+            self._setup_line_profiler()
         
     def _setup_line_profiler(self):
         """Setup line profiler for the sketch methods."""
+        # Imported lazily so runs without profiling don't pay for the import
+        try:
+            from line_profiler import LineProfiler
+        except ImportError:
+            logger.error("line_profiler is not installed! Install with: pip install line_profiler")
+            self.enable_line_profile = False
+            return
+        
         logger.info(f"Setting up line profiler for {self.sketch_name}...")
         self.line_profiler = LineProfiler()
         
@@ -81,25 +177,25 @@ class LatencyMonitor:
             from QuantileFlow.ddsketch.storage.contiguous import ContiguousStorage
             from QuantileFlow.ddsketch.mapping.logarithmic import LogarithmicMapping
             
-            self.line_profiler.add_function(DDSketch.insert)
+            self.line_profiler.add_function(DDSketch.insert_batch)
             self.line_profiler.add_function(DDSketch.quantile)
-            self.line_profiler.add_function(ContiguousStorage.add)
-            self.line_profiler.add_function(LogarithmicMapping.compute_bucket_index)
-            logger.info("Profiling: DDSketch.insert, DDSketch.quantile, ContiguousStorage.add, LogarithmicMapping.compute_bucket_index")
+            self.line_profiler.add_function(ContiguousStorage.add_many)
+            self.line_profiler.add_function(LogarithmicMapping.compute_bucket_indices)
+            logger.info("Profiling: DDSketch.insert_batch, DDSketch.quantile, ContiguousStorage.add_many, LogarithmicMapping.compute_bucket_indices")
             
         elif self.sketch_type == 'momentsketch':
             from QuantileFlow.momentsketch.core import MomentSketch
             
-            self.line_profiler.add_function(MomentSketch.insert)
+            self.line_profiler.add_function(MomentSketch.insert_batch)
             self.line_profiler.add_function(MomentSketch.quantile)
-            logger.info("Profiling: MomentSketch.insert, MomentSketch.quantile")
+            logger.info("Profiling: MomentSketch.insert_batch, MomentSketch.quantile")
             
         elif self.sketch_type == 'hdrhistogram':
             from QuantileFlow.hdrhistogram.core import HDRHistogram
             
-            self.line_profiler.add_function(HDRHistogram.insert)
+            self.line_profiler.add_function(HDRHistogram.insert_batch)
             self.line_profiler.add_function(HDRHistogram.quantile)
-            logger.info("Profiling: HDRHistogram.insert, HDRHistogram.quantile")
+            logger.info("Profiling: HDRHistogram.insert_batch, HDRHistogram.quantile")
         
         # Note: datadog DDSketch profiling would require profiling their library code
         # which is not as useful for optimizing QuantileFlow
@@ -112,133 +208,189 @@ class LatencyMonitor:
             bootstrap_servers=KAFKA_CONFIG['bootstrap_servers'],
             group_id=KAFKA_CONFIG['group_id'],
             client_id=f"{KAFKA_CONFIG['client_id']}-consumer",
-            value_deserializer=deserialize_message,
             auto_offset_reset='earliest',
             enable_auto_commit=True,
-            max_poll_interval_ms=300000
+            max_poll_interval_ms=300000,
+            # Fetch in large batches to amortize per-poll and per-record overhead.
+            # Sizes are in wire bytes, so producer-side lz4 compression stretches
+            # them further.
+            max_poll_records=5000,
+            fetch_min_bytes=1 << 20,  # 1MB
+            fetch_max_bytes=32 << 20,  # 32MB
+            fetch_max_wait_ms=50,
+            max_partition_fetch_bytes=8 << 20,  # 8MB
+            receive_buffer_bytes=1 << 20  # 1MB
         )
 
     def process_metrics(self):
         consumer = self._create_consumer()
+        batches = queue.Queue(maxsize=MAX_PENDING_BATCHES)
+        # Batches the fetcher had polled but not queued when shutdown began
+        unqueued = []
+        fetcher = threading.Thread(
+            target=self._fetch_loop, args=(consumer, batches, unqueued), daemon=True
+        )
         try:
             signal.signal(signal.SIGTERM, self.shutdown)
             signal.signal(signal.SIGINT, self.shutdown)
             
-            # Enable line profiler if configured
-            if self.enable_line_profile and self.line_profiler:
-                logger.info("Enabling line profiler...")
-                self.line_profiler.enable()
+            # Line profiler, if configured, only traces every Nth batch
+            profiler = self.line_profiler if self.enable_line_profile else None
+            if profiler is not None:
+                logger.info(f"Profiling 1 in {self.profile_sample_rate} batches...")
+            sample_rate = self.profile_sample_rate
+            batch_num = 0
             
+            # Hot-loop references as locals; self.running stays an attribute
+            # read because shutdown() flips it from the signal handler
+            get_batch = batches.get
+            process_batch = self._process_batch
+            empty = queue.Empty
+            
+            # Kafka I/O runs on the fetcher thread; decoding, sketch updates and
+            # rendering stay on this thread
+            fetcher.start()
             while self.running:
-                records = consumer.poll(timeout_ms=3000)
-                for tp, messages in records.items():
-                    for record in messages:
-                        self._process_record(record)
+                try:
+                    messages = get_batch(timeout=0.1)
+                except empty:
+                    continue
+                if profiler is not None and batch_num % sample_rate == 0:
+                    profiler.enable_by_count()
+                    try:
+                        process_batch(messages)
+                    finally:
+                        profiler.disable_by_count()
+                else:
+                    process_batch(messages)
+                batch_num += 1
         except Exception as e:
             logger.error(f"Consumer error: {e}")
         finally:
-            # Disable and save profiler results
+            self.running = False
+            if fetcher.is_alive():
+                fetcher.join()
+            
+            # Auto-commit already covers every polled batch and close() commits
+            # again, so insert whatever is still queued or held by the fetcher
+            # before closing or those records are lost
+            while True:
+                try:
+                    self._process_batch(batches.get_nowait())
+                except queue.Empty:
+                    break
+            for messages in unqueued:
+                self._process_batch(messages)
+            
+            # Save profiler results
             if self.enable_line_profile and self.line_profiler:
-                logger.info("Disabling line profiler and saving results...")
-                self.line_profiler.disable()
+                logger.info("Saving line profiler results...")
                 self._save_profile_results()
             
             consumer.close()
 
+    def _fetch_loop(self, consumer, batches, unqueued):
+        """Poll Kafka and hand raw record batches to the processing loop.
+
+        Batches from the last poll that cannot be queued once shutdown begins
+        are appended to unqueued for the final drain.
+        """
+        poll = consumer.poll
+        put_batch = batches.put
+        full = queue.Full
+        try:
+            while self.running:
+                records = poll(timeout_ms=POLL_TIMEOUT_MS)
+                for messages in records.values():
+                    # Wait for room in the queue, but keep honoring shutdown
+                    while True:
+                        if not self.running:
+                            unqueued.append(messages)
+                            break
+                        try:
+                            put_batch(messages, timeout=0.1)
+                            break
+                        except full:
+                            continue
+        except Exception as e:
+            logger.error(f"Fetcher error: {e}")
+            self.running = False
+
     def calculate_stats(self):
-        # Get count based on sketch type
-        if self.sketch_type == 'momentsketch':
-            # MomentSketch uses summary_statistics() for count
-            summary = self.sketch.summary_statistics()
-            stats = {'count': int(summary.get('count', 0)), 'mean': summary.get('mean', 0)}
-        elif self.sketch_type == 'hdrhistogram':
-            # HDRHistogram uses total_count
-            stats = {'count': self.sketch.total_count, 'mean': 0}
-        elif self.sketch_type == 'datadog':
-            stats = {'count': self.sketch.count, 'mean': 0}
-        else:
-            # QuantileFlow DDSketch uses .count property
-            stats = {'count': self.sketch.count, 'mean': 0}
+        stats = self._stats
+        stats.count, stats.mean = self._summary_fn()
         
-        if stats['count'] > 0:
-            # Get percentiles based on sketch type
-            if self.sketch_type == 'datadog':
-                stats['p50'] = self.sketch.get_quantile_value(0.5)
-                stats['p95'] = self.sketch.get_quantile_value(0.95)
-                stats['p99'] = self.sketch.get_quantile_value(0.99)
-            elif self.sketch_type == 'momentsketch':
-                stats['p50'] = self.sketch.quantile(0.5)
-                stats['p95'] = self.sketch.quantile(0.95)
-                stats['p99'] = self.sketch.quantile(0.99)
-            elif self.sketch_type == 'hdrhistogram':
-                stats['p50'] = self.sketch.quantile(0.5)
-                stats['p95'] = self.sketch.quantile(0.95)
-                stats['p99'] = self.sketch.quantile(0.99)
-            else:  # quantileflow ddsketch
-                stats['p50'] = self.sketch.quantile(0.5)
-                stats['p95'] = self.sketch.quantile(0.95)
-                stats['p99'] = self.sketch.quantile(0.99)
+        if stats.count > 0:
+            q = self._quantile_fn
+            stats.p50 = q(0.5)
+            stats.p95 = q(0.95)
+            stats.p99 = q(0.99)
             
         return stats
 
-    def _process_record(self, record):
+    def _process_batch(self, messages):
+        """Insert a polled batch of records and refresh the dashboard once."""
+        if not messages:
+            return
         try:
-            data = record.value
-            latency = data['latency']
+            decode = deserialize_message
+            try:
+                data = [decode(record.value) for record in messages]
+            except (msgspec.DecodeError, TypeError):
+                # Rare path: re-decode record by record and drop the bad ones
+                data = self._decode_valid(messages)
+                if not data:
+                    return
+            latencies = np.fromiter(
+                (d.latency for d in data),
+                dtype=np.float64,
+                count=len(data)
+            )
+            
+            # Insert the whole batch into the selected sketch
+            self._insert_batch(latencies)
             
-            # Insert the latency value into the selected sketch
-            if self.sketch_type == 'datadog':
-                self.sketch.add(float(latency))
-            else:
-                # QuantileFlow sketches use .insert()
-                self.sketch.insert(latency)
+            self.msg_count += len(data)  # Count every message processed
             
-            self.msg_count += 1  # Count every message processed
-            stats = self.calculate_stats()
-            self._print_metrics(data, stats)
+            # Only compute quantiles when the dashboard is due for a refresh
+            now = time.monotonic()
+            if now - self.last_refresh >= self.refresh_interval:
+                stats = self.calculate_stats()
+                self._print_metrics(data[-1].block_id, latencies[-1], stats, now)
         except Exception as e:
-            logger.error(f"Error processing record: {e}")
+            logger.error(f"Error processing batch: {e}")
     
-    def _print_metrics(self, data, stats):
-        current_time = time.time()
-        
-        # Only refresh display if interval has elapsed
-        if current_time - self.last_refresh < self.refresh_interval:
-            return
-        
+    def _decode_valid(self, messages):
+        """Decode records one at a time, counting malformed ones as dropped."""
+        data = []
+        for record in messages:
+            try:
+                data.append(deserialize_message(record.value))
+            except (msgspec.DecodeError, TypeError):
+                self.dropped_count += 1
+        return data
+    
+    def _print_metrics(self, block_id, latency, stats, current_time):
         self.last_refresh = current_time
         elapsed = current_time - self.start_time
         throughput = self.msg_count / elapsed if elapsed > 0 else 0
         
-        sys.stdout.write("\033[2J\033[H")  # Clear screen
-        sys.stdout.write(f"{'='*80}\n")
-        sys.stdout.write(f"Latency Monitor Dashboard - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        sys.stdout.write(f"Sketch Algorithm: {self.sketch_name}\n")
-        sys.stdout.write(f"{'='*80}\n\n")
-        
-        # Block Information
-        sys.stdout.write(f"Block ID: {data['block_id']}\n")
-        sys.stdout.write(f"Current Latency: {data['latency']:>8.2f} ms\n\n")
-        
-        # Performance Metrics
-        sys.stdout.write("Performance Metrics:\n")
-        sys.stdout.write(f"Messages Processed: {self.msg_count:>8.0f}\n")
-        sys.stdout.write(f"Data Points in Sketch: {stats['count']:>8.0f}\n")
-        sys.stdout.write(f"Runtime: {elapsed:>8.2f} sec\n")
-        sys.stdout.write(f"Throughput: {throughput:>8.2f} msg/sec\n")
-        sys.stdout.write(f"Refresh Rate: {self.refresh_interval:>8.2f} sec\n\n")
-        
-        # Statistics
-        sys.stdout.write("Latency Statistics:\n")
-        sys.stdout.write(f"  Mean: {stats['mean']:>8.2f} ms\n\n")
-        
-        sys.stdout.write(f"{self.sketch_name} Percentiles:\n")
-        sys.stdout.write(f"  P50:  {stats.get('p50', 0):>8.2f} ms\n")
-        sys.stdout.write(f"  P95:  {stats.get('p95', 0):>8.2f} ms\n")
-        sys.stdout.write(f"  P99:  {stats.get('p99', 0):>8.2f} ms\n")
-        
-        sys.stdout.write(f"\n{'='*80}\n")
-        sys.stdout.flush()
+        stdout = sys.stdout
+        stdout.write(self._frame_tmpl.format(
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            block_id=block_id,
+            latency=latency,
+            msg_count=self.msg_count,
+            count=stats.count,
+            dropped=self.dropped_count,
+            elapsed=elapsed,
+            throughput=throughput,
+            mean=stats.mean,
+            p50=stats.p50,
+            p95=stats.p95,
+            p99=stats.p99
+        ))
+        stdout.flush()
 
     def _save_profile_results(self):
         """Save line profiler results to file."""
@@ -258,7 +410,9 @@ Line-by-Line Profiling Results - Kafka Metrics Streaming Benchmark
 {'='*120}
 Sketch Algorithm: {self.sketch_name}
 Messages Processed: {self.msg_count:,}
-Total Runtime: {time.time() - self.start_time:.2f} seconds
+Dropped Records: {self.dropped_count:,}
+Profile Sample Rate: 1 in {self.profile_sample_rate} batches
+Total Runtime: {time.monotonic() - self.start_time:.2f} seconds
 Timestamp: {datetime.now().isoformat()}
 {'='*120}
 
@@ -275,7 +429,7 @@ Timestamp: {datetime.now().isoformat()}
             print(f"Line Profiling Summary - {self.sketch_name}")
             print("="*120)
             print(f"Messages processed: {self.msg_count:,}")
-            print(f"Total runtime: {time.time() - self.start_time:.2f} seconds")
+            print(f"Total runtime: {time.monotonic() - self.start_time:.2f} seconds")
             print(f"Full results saved to: {output_path.absolute()}")
             print("="*120 + "\n")
             
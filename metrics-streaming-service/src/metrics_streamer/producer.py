@@ -1,6 +1,6 @@
 from kafka import KafkaProducer
+import msgspec
 import pandas as pd
-import json
 import logging
 import sys
 from pathlib import Path
@@ -12,8 +12,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_encoder = msgspec.json.Encoder()
+
 def serialize_message(x):
-    return json.dumps(x).encode('utf-8')
+    return _encoder.encode(x)
 
 def on_success(record_metadata):
     logger.debug(f"Message sent to {record_metadata.topic}[{record_metadata.partition}] @ offset {record_metadata.offset}")
@@ -22,8 +24,13 @@ def on_error(exc):
     logger.error(f"Error sending message: {exc}")
 
 class LogProducer:
-    def __init__(self):
-        self.producer = KafkaProducer(
+    def __init__(self, **producer_kwargs):
+        """
+        Args:
+            **producer_kwargs: Extra KafkaProducer settings (e.g. batching or
+                               compression), overriding the defaults below.
+        """
+        config = dict(
             bootstrap_servers=KAFKA_CONFIG['bootstrap_servers'],
             client_id=f"{KAFKA_CONFIG['client_id']}-producer",
             value_serializer=serialize_message,
@@ -31,6 +38,8 @@ class LogProducer:
             retries=5,
             retry_backoff_ms=1000
         )
+        config.update(producer_kwargs)
+        self.producer = KafkaProducer(**config)
 
     def send_metric(self, data):
         future = self.producer.send(
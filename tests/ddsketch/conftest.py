@@ -36,27 +36,43 @@ def basic_sketch():
 def populated_sketch():
     """Returns a DDSketch instance populated with some test data"""
     sketch = DDSketch(relative_accuracy=0.01)
-    values = [1.0, 2.0, 3.0, 4.0, 5.0]
-    for v in values:
-        sketch.insert(v)
+    sketch.insert_batch(np.array([1.0, 2.0, 3.0, 4.0, 5.0]))
     return sketch
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def random_data():
-    """Returns random test data from different distributions"""
-    np.random.seed(42)
-    return {
-        'uniform': np.random.uniform(1, 100, 1000),
-        'normal': np.random.normal(50, 10, 1000),
-        'lognormal': np.random.lognormal(0, 1, 1000),
-        'exponential': np.random.exponential(10, 1000)
+    """Returns random test data from different distributions (read-only, shared)"""
+    rng = np.random.RandomState(42)
+    data = {
+        'uniform': rng.uniform(1, 100, 1000),
+        'normal': rng.normal(50, 10, 1000),
+        'lognormal': rng.lognormal(0, 1, 1000),
+        'exponential': rng.exponential(10, 1000)
     }
+    for values in data.values():
+        values.setflags(write=False)
+    return data
+
+@pytest.fixture(scope="session")
+def lognormal_1k():
+    """Returns 1000 log-normal values, quantile levels and true quantiles (read-only, shared)"""
+    values = np.random.default_rng(42).lognormal(0, 1, 1000)
+    values.setflags(write=False)
+    qs = np.array([0.1, 0.25, 0.5, 0.75, 0.9])
+    return values, qs, np.quantile(values, qs)
+
+@pytest.fixture(scope="session")
+def pareto_1k():
+    """Returns 1000 sorted Pareto (a=3) values with their true median, Q1 and Q3"""
+    # Inverse CDF method for Pareto; shape a=3 keeps the variance finite
+    values = np.sort(1 / (1 - np.random.default_rng(42).random(1000)) ** (1/3))
+    values.setflags(write=False)
+    n = len(values)
+    return values, values[n // 2], values[n // 4], values[3 * n // 4]
 
 @pytest.fixture
 def mixed_sign_sketch():
     """Returns a DDSketch instance with both positive and negative values"""
     sketch = DDSketch(relative_accuracy=0.01, cont_neg=True)
-    values = [-5.0, -3.0, -1.0, 0.0, 1.0, 3.0, 5.0]
-    for v in values:
-        sketch.insert(v)
+    sketch.insert_batch(np.array([-5.0, -3.0, -1.0, 0.0, 1.0, 3.0, 5.0]))
     return sketch 
\ No newline at end of file
@@ -1,13 +1,14 @@
 import pytest
+import numpy as np
 from QuantileFlow.ddsketch.mapping.logarithmic import LogarithmicMapping
 from QuantileFlow.ddsketch.mapping.linear_interpolation import LinearInterpolationMapping
 from QuantileFlow.ddsketch.mapping.cubic_interpolation import CubicInterpolationMapping
 
-@pytest.fixture(params=[0.01, 0.001, 0.1])
+@pytest.fixture(scope="module", params=[0.01, 0.001, 0.1])
 def relative_accuracy(request):
     return request.param
 
-@pytest.fixture(params=[
+@pytest.fixture(scope="module", params=[
     LogarithmicMapping,
     LinearInterpolationMapping,
     CubicInterpolationMapping
@@ -15,20 +16,22 @@ def relative_accuracy(request):
 def mapping_class(request):
     return request.param
 
-def test_mapping_initialization(mapping_class, relative_accuracy):
-    mapping = mapping_class(relative_accuracy)
+@pytest.fixture(scope="module")
+def mapping(mapping_class, relative_accuracy):
+    """Shared mapping instance per (class, accuracy); tests must not mutate it"""
+    return mapping_class(relative_accuracy)
+
+def test_mapping_initialization(mapping, relative_accuracy):
     assert mapping.relative_accuracy == relative_accuracy
 
-def test_bucket_index_monotonicity(mapping_class, relative_accuracy):
-    mapping = mapping_class(relative_accuracy)
+def test_bucket_index_monotonicity(mapping):
     values = [1.0, 2.0, 3.0, 4.0, 5.0]
     indices = [mapping.compute_bucket_index(v) for v in values]
     
     # Check that indices are monotonically increasing
     assert all(indices[i] <= indices[i+1] for i in range(len(indices)-1))
 
-def test_value_reconstruction(mapping_class, relative_accuracy):
-    mapping = mapping_class(relative_accuracy)
+def test_value_reconstruction(mapping, relative_accuracy):
     test_values = [0.1, 1.0, 10.0, 100.0]
     
     for value in test_values:
@@ -44,9 +47,7 @@ def test_value_reconstruction(mapping_class, relative_accuracy):
         epsilon = 1e-12
         assert relative_error <= relative_accuracy + epsilon, f"Relative error {relative_error} exceeds bound {relative_accuracy} for value {value}"
 
-def test_extreme_values(mapping_class, relative_accuracy):
-    mapping = mapping_class(relative_accuracy)
-    
+def test_extreme_values(mapping, mapping_class, relative_accuracy):
     # Test very small and very large values
     small_value = 1e-100
     large_value = 1e100
@@ -74,9 +75,7 @@ def test_extreme_values(mapping_class, relative_accuracy):
     assert abs(large_reconstructed - large_value) / large_value <= relative_accuracy * extreme_relax_factor, \
         f"Large value: {large_value}, reconstructed: {large_reconstructed}, relative error: {abs(large_reconstructed - large_value) / large_value}"
 
-def test_consecutive_buckets(mapping_class, relative_accuracy):
-    mapping = mapping_class(relative_accuracy)
-    
+def test_consecutive_buckets(mapping, relative_accuracy):
     # Test that consecutive bucket indices give values within relative accuracy
     value = 1.0
     index = mapping.compute_bucket_index(value)
@@ -126,10 +125,8 @@ def test_specific_mapping_features():
     # The indices should be different due to different mapping strategies
     assert len({log_index, lin_index, cubic_index}) > 1
 
-def test_mapping_consistency(mapping_class, relative_accuracy):
+def test_mapping_consistency(mapping):
     """Test that mapping is consistent across multiple calls"""
-    mapping = mapping_class(relative_accuracy)
-    
     # Test multiple calls with same value
     value = 1.234
     indices = [mapping.compute_bucket_index(value) for _ in range(10)]
@@ -141,4 +138,14 @@ def test_mapping_consistency(mapping_class, relative_accuracy):
     reconstructions = [mapping.compute_value_from_index(indices[0]) for _ in range(10)]
     
     # All reconstructions should be identical
-    assert len(set(reconstructions)) == 1 
\ No newline at end of file
+    assert len(set(reconstructions)) == 1
+
+def test_vectorized_bucket_indices(mapping):
+    """Test that the array path matches the scalar bucket index"""
+    values = np.random.default_rng(42).lognormal(0, 4, 1000)
+    values = np.concatenate([values, [1e-300, 0.5, 1.0, 2.0, 3.0, 1e300]])
+    
+    indices = mapping.compute_bucket_indices(values)
+    
+    assert indices.dtype == np.int64
+    assert indices.tolist() == [mapping.compute_bucket_index(v) for v in values.tolist()]
@@ -5,32 +5,36 @@ from QuantileFlow.ddsketch.storage.sparse import SparseStorage
 import warnings
 import numpy as np
 
-@pytest.fixture(params=[ContiguousStorage, SparseStorage])
-def storage_class(request):
-    return request.param
+# Out-of-range lookups warn by design
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+# ContiguousStorage only supports the FIXED strategy
+VALID_COMBOS = [(ContiguousStorage, BucketManagementStrategy.FIXED)] + [
+    (SparseStorage, strategy) for strategy in BucketManagementStrategy
+]
+
+storage_combos = pytest.mark.parametrize(
+    "storage_class,bucket_strategy",
+    VALID_COMBOS,
+    ids=[f"{cls.__name__}-{strategy.name}" for cls, strategy in VALID_COMBOS]
+)
 
 @pytest.fixture(params=[32, 64, 128])
 def max_buckets(request):
     return request.param
 
-@pytest.fixture(params=[
-    BucketManagementStrategy.FIXED,
-    BucketManagementStrategy.DYNAMIC,
-    BucketManagementStrategy.UNLIMITED
-])
-def bucket_strategy(request):
-    return request.param
+def _make_storage(storage_class, bucket_strategy, max_buckets):
+    """Construct a storage for one of the VALID_COMBOS"""
+    if storage_class is ContiguousStorage:
+        return storage_class(max_buckets)
+    if bucket_strategy is BucketManagementStrategy.FIXED:
+        return storage_class(max_buckets, bucket_strategy)
+    # max_buckets is ignored (with a warning) by the other strategies
+    return storage_class(strategy=bucket_strategy)
 
+@storage_combos
 def test_storage_initialization(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
+    storage = _make_storage(storage_class, bucket_strategy, max_buckets)
     
     # Check max_buckets based on strategy
     if bucket_strategy == BucketManagementStrategy.FIXED:
@@ -44,16 +48,8 @@ def test_storage_initialization(storage_class, max_buckets, bucket_strategy):
     if hasattr(storage, 'strategy'):
         assert storage.strategy == bucket_strategy
 
-def test_add_and_get_count(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
+def _add_and_get_count(make_storage):
+    storage = make_storage()
     
     # Add counts to some buckets
     test_buckets = {0: 1, 5: 3, 10: 2}
@@ -63,24 +59,13 @@ def test_add_and_get_count(storage_class, max_buckets, bucket_strategy):
     
     # Verify counts
     for bucket, expected_count in test_buckets.items():
-        count = storage.get_count(bucket)
-        assert count == expected_count
+        assert storage.get_count(bucket) == expected_count
     
     # Test non-existent bucket
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        assert storage.get_count(999) == 0
+    assert storage.get_count(999) == 0
 
-def test_remove(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
+def _remove(make_storage):
+    storage = make_storage()
     
     # Add and remove counts
     bucket_idx = 5
@@ -90,25 +75,13 @@ def test_remove(storage_class, max_buckets, bucket_strategy):
     
     assert storage.get_count(bucket_idx) == 1
     
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        # Remove from empty bucket
-        storage.remove(999)  # Should not raise error
-        assert storage.get_count(999) == 0
+    # Remove from empty bucket
+    storage.remove(999)  # Should not raise error
+    assert storage.get_count(999) == 0
 
-def test_merge(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage1 = storage_class(max_buckets)
-        storage2 = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage1 = storage_class(max_buckets, bucket_strategy)
-            storage2 = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage1 = storage_class(strategy=bucket_strategy)
-            storage2 = storage_class(strategy=bucket_strategy)
+def _merge(make_storage):
+    storage1 = make_storage()
+    storage2 = make_storage()
     
     # Add counts to both storages
     storage1.add(0)
@@ -123,28 +96,71 @@ def test_merge(storage_class, max_buckets, bucket_strategy):
     assert storage1.get_count(5) == 2
     assert storage1.get_count(10) == 1
 
+def _clear(make_storage):
+    storage = make_storage()
+    
+    # Add some counts
+    storage.add(0)
+    storage.add(5)
+    storage.add(10)
+    
+    # Clear the storage
+    if hasattr(storage, 'clear'):
+        storage.clear()
+        
+        # Verify all counts are zero
+        assert storage.get_count(0) == 0
+        assert storage.get_count(5) == 0
+        assert storage.get_count(10) == 0
+
+# Basic operations that behave the same for every storage and bucket limit
+STORAGE_OPS = [_add_and_get_count, _remove, _merge, _clear]
+
+@storage_combos
+@pytest.mark.parametrize("op", STORAGE_OPS, ids=lambda op: op.__name__.lstrip('_'))
+def test_storage_ops(storage_class, bucket_strategy, op):
+    op(lambda: _make_storage(storage_class, bucket_strategy, 32))
+
+@storage_combos
+def test_add_many(storage_class, max_buckets, bucket_strategy):
+    storage = _make_storage(storage_class, bucket_strategy, max_buckets)
+
+    # Bulk add should match adding each bucket individually
+    storage.add(3)
+    storage.add_many([-2, 0, 3, 7], [1, 4, 2, 5])
+
+    assert storage.get_count(-2) == 1
+    assert storage.get_count(0) == 4
+    assert storage.get_count(3) == 3
+    assert storage.get_count(7) == 5
+    assert storage.total_count == 13
+    assert storage.min_key == -2
+    assert storage.max_key == 7
+
+    # Empty batches are a no-op
+    storage.add_many([], [])
+    storage.add_many(np.array([], dtype=np.int64), np.array([]))
+    assert storage.total_count == 13
+
+    # Keys need not be sorted
+    storage.add_many([5, -4, 10], [1, 2, 3])
+    assert storage.get_count(5) == 1
+    assert storage.get_count(-4) == 2
+    assert storage.get_count(10) == 3
+    assert storage.total_count == 19
+    assert storage.min_key == -4
+    assert storage.max_key == 10
+
+@storage_combos
 def test_bucket_limit(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
+    storage = _make_storage(storage_class, bucket_strategy, max_buckets)
     
     # Add more buckets than max_buckets
     for i in range(max_buckets + 10):
         storage.add(i)
     
     # Count total non-zero buckets
-    if storage_class == ContiguousStorage:
-        # For ContiguousStorage, count physical storage buckets
-        non_zero_buckets = sum(1 for count in storage.counts if count > 0)
-    else:
-        # For other storage types, count logical buckets
-        non_zero_buckets = sum(1 for i in range(max_buckets + 10) if storage.get_count(i) > 0)
+    non_zero_buckets = storage.num_buckets
     
     if bucket_strategy == BucketManagementStrategy.FIXED:
         # FIXED strategy should respect max_buckets exactly
@@ -181,12 +197,8 @@ def test_contiguous_storage_specific():
     assert storage.get_count(max_bucket) == 1
     
     # Test out of range buckets
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        assert storage.get_count(max_bucket + 1) == 0
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        assert storage.get_count(-1) == 0
+    assert storage.get_count(max_bucket + 1) == 0
+    assert storage.get_count(-1) == 0
 
 def test_sparse_storage_specific():
     """Test SparseStorage-specific features"""
@@ -194,8 +206,7 @@ def test_sparse_storage_specific():
     
     # Test dynamic bucket management behavior
     # Add many buckets to force dynamic resizing
-    for i in range(100):
-        storage.add(i)
+    storage.add_many(list(range(100)), [1] * 100)
     
     # Verify that buckets are managed according to dynamic strategy
     # For n values, expect roughly 100*log10(n+1) buckets
@@ -208,41 +219,9 @@ def test_sparse_storage_specific():
     storage.add(last_bucket)
     assert storage.get_count(last_bucket) == initial_count + 1
 
-def test_storage_clear(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
-    
-    # Add some counts
-    storage.add(0)
-    storage.add(5)
-    storage.add(10)
-    
-    # Clear the storage
-    if hasattr(storage, 'clear'):
-        storage.clear()
-        
-        # Verify all counts are zero
-        assert storage.get_count(0) == 0
-        assert storage.get_count(5) == 0
-        assert storage.get_count(10) == 0
-
+@storage_combos
 def test_negative_buckets(storage_class, max_buckets, bucket_strategy):
-    if storage_class == ContiguousStorage:
-        if bucket_strategy != BucketManagementStrategy.FIXED:
-            pytest.skip("ContiguousStorage only supports FIXED strategy")
-        storage = storage_class(max_buckets)
-    else:
-        if bucket_strategy == BucketManagementStrategy.FIXED:
-            storage = storage_class(max_buckets, bucket_strategy)
-        else:
-            storage = storage_class(strategy=bucket_strategy)
+    storage = _make_storage(storage_class, bucket_strategy, max_buckets)
     
     # Test adding negative bucket indices
     if storage_class == SparseStorage:
@@ -262,6 +241,7 @@ def test_unlimited_strategy_warning():
         SparseStorage(max_buckets=100, strategy=BucketManagementStrategy.UNLIMITED)
     
     # No warning should be raised when using default max_buckets
-    with warnings.catch_warnings():
-        warnings.simplefilter("error")  # Turn warnings into errors
-        SparseStorage(strategy=BucketManagementStrategy.UNLIMITED)  # Just create without assigning 
\ No newline at end of file
+    with warnings.catch_warnings(record=True) as record:
+        warnings.simplefilter("always")  # Override the module-level ignore inside this block
+        SparseStorage(strategy=BucketManagementStrategy.UNLIMITED)  # Just create without assigning
+    assert not [w for w in record if issubclass(w.category, UserWarning)] 
\ No newline at end of file